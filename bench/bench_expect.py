@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# encoding: utf8
+
+"""Microbenchmarks for the most common ways to call a matcher.
+
+Needs pyperf (pip install pyperf), run from the repository root like this:
+
+    python bench/bench_expect.py -o before.json
+    python bench/bench_expect.py -o after.json
+    python -m pyperf compare_to before.json after.json
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import pyperf
+from pyexpect import expect
+
+def operator_matcher():
+    expect('foo') == 'foo'
+
+def named_matcher():
+    expect(3).equals(3)
+
+def chained_matcher():
+    expect(3).to_be(3)
+
+if __name__ == '__main__':
+    runner = pyperf.Runner()
+    # separate cases, so regressions can be attributed to the operator or the attribute dispatch path
+    runner.bench_func("expect('foo') == 'foo'", operator_matcher)
+    runner.bench_func("expect(3).equals(3)", named_matcher)
+    runner.bench_func("expect(3).to_be(3)", chained_matcher)
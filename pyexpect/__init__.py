@@ -4,6 +4,13 @@
 # ISC Licensed <https://opensource.org/licenses/ISC>
 # Author: Martin Häcker mhaecker ät mac dot com
 
+"""Minimal but very flexible implementation of the expect pattern, see `expect`.
+
+PYTEST_DONT_REWRITE: pyexpect produces its own error messages and uses no assert statements,
+so it should never be subject to pytest's assertion rewriting, even if it is imported in a way
+that would otherwise make pytest rewrite it.
+"""
+
 # Inspired by:
 # Rubys RSpec that got me longing for a similar syntax
 # Robert who suggested lots of great api ideas
@@ -18,8 +25,10 @@
 
 __all__ = ['expect']
 
-import re, sys, numbers, types
+import sys, numbers, types, collections
 from .internals import ExpectMetaMagic, alias_with_hidden_backtrace
+from .internals import matcher_with_class_level_alternative, RaisesContext
+from .internals import reraise, compile_regex
 
 marker = object()
 
@@ -50,6 +59,11 @@ class expect(ExpectMetaMagic):
     For more options and a list of the matchers, see the source. :)
     """
     
+    # One expect instance is created for every expectation, so keep its own state in slots.
+    # __dict__ and __weakref__ keep custom matchers that store state on self and weak references working,
+    # the __dict__ is only created when something is actually stored in it.
+    __slots__ = ('_actual', '_should_raise', '_custom_message', '__dict__', '__weakref__')
+    
     def __init__(self, actual, should_raise=True, message=None):
         """Initialize a useable assertion object that you can chain off of.
         
@@ -66,7 +80,6 @@ class expect(ExpectMetaMagic):
         self._should_raise = should_raise
         self._custom_message = message
         self._expected_assertion_result = True
-        self._selected_matcher = None
         self._selected_matcher_name = None
     
     @classmethod
@@ -185,9 +198,10 @@ class expect(ExpectMetaMagic):
             expect(by).is_instance_of(numbers.Number)    
             if to is not marker: expect(to).is_instance_of(numbers.Number)
             if from_ is not marker: expect(from_).is_instance_of(numbers.Number)
-            if to is not marker and from_ is not marker:
-                assert from_ + by == to, \
-                    "Inconsistant arguments: from={from_!r} + by={by!r} != to={to!r}".format(**locals())
+            # Raising explicitly instead of using the assert statement, so this is still checked with `python -O`
+            if to is not marker and from_ is not marker and not from_ + by == to:
+                raise AssertionError(
+                    "Inconsistant arguments: from={from_!r} + by={by!r} != to={to!r}".format(**locals()))
         
         before = getter()
         self._actual()
@@ -320,10 +334,11 @@ class expect(ExpectMetaMagic):
     to_have_attributes = has_attribute
     
     def matches(self, regex):
-        string_type = type(regex)
+        regex = compile_regex(regex)
+        string_type = type(regex.pattern)
         expect(self._actual).is_instance(string_type)
         
-        self._assert(re.search(regex, self._actual) is not None, "to be matched by regex r{0!r}", regex)
+        self._assert(regex.search(self._actual) is not None, "to be matched by regex r{0!r}", regex.pattern)
     
     match = matching = matches
     is_matching = to_match = matches
@@ -338,15 +353,13 @@ class expect(ExpectMetaMagic):
     
     endswith = to_end_with = ends_with
     
-    # TODO: consider with statement support to allow code like this
-    # with expect.raises(AssertionError):
-    #   something.that_might_raise()
     def to_raise(self, exception_class=Exception, message_regex=None):
         """ Check regexes by type and an optional message.
         
         Example:
         catched_regex = expect(lambda: some_call(arg)).raises(SomeError)
         catched_regex = expec(lambda: some_call(arg)).raises(SomeError, "a regex for the message")
+        catched_regex = expec(lambda: some_call(arg)).raises(SomeError, re.compile("a precompiled regex"))
         
         Always returns the exception that is caught.
         
@@ -365,26 +378,36 @@ class expect(ExpectMetaMagic):
             caught_exception = exception
             _, _, traceback = sys.exc_info()
         
-        is_right_class = isinstance(caught_exception, exception_class)
+        # mostly the exact exception class is expected, which is much cheaper to check than isinstance()
+        is_right_class = type(caught_exception) is exception_class or isinstance(caught_exception, exception_class)
         if message_regex is None:
             self._assert(is_right_class, 
                 "to raise {0} but it raised:\n\t{1!r}", exception_class.__name__, caught_exception)
         else:
-            has_matching_message = re.search(message_regex, str(caught_exception)) is not None
+            message_regex = compile_regex(message_regex)
+            has_matching_message = message_regex.search(str(caught_exception)) is not None
             self._assert(is_right_class and has_matching_message, 
                 "to raise {0} with message matching:\n\tr'{1}'\nbut it raised:\n\t{2!r}", 
-                exception_class.__name__, message_regex, caught_exception)
+                exception_class.__name__, message_regex.pattern, caught_exception)
         
         if self._is_negative() and caught_exception:
-            if sys.version < '3':
-                exec("raise caught_exception, None, traceback")
-            else:
-                raise caught_exception
+            reraise(caught_exception, traceback)
         
         return caught_exception
     
-    throw = throwing = throws = raise_ = raising = raises = to_raise
+    def _raises_context(cls, exception_class=Exception, message_regex=None):
+        """Context manager form of to_raise(), checks the exception raised in the with block.
+        
+        Example:
+        with expect.raises(SomeError, "a regex for the message") as context:
+            some_call(arg)
+        caught_exception = context.exception
+        """
+        return RaisesContext(cls, exception_class, message_regex)
+    
+    throw = throwing = throws = raise_ = raising = to_raise
     is_raising = is_throwing = to_throw = to_raise
+    raises = matcher_with_class_level_alternative(to_raise, _raises_context)
     
     def empty(self):
         self._assert(len(self._actual) == 0, "to be empty")
@@ -392,8 +415,10 @@ class expect(ExpectMetaMagic):
     is_empty = to_be_empty = empty
     
     def instance_of(self, a_class, *additional_classes):
+        actual_class = type(self._actual)
         for cls in self._concatenate(a_class, *additional_classes):
-            self._assert(isinstance(self._actual, cls), "to be instance of '{0}'", a_class.__name__)
+            # exact type matches are the common case and much cheaper to check than isinstance()
+            self._assert(actual_class is cls or isinstance(self._actual, cls), "to be instance of '{0}'", a_class.__name__)
     
     isinstance = instanceof = instance_of
     is_instance = is_instance_of = instance_of
@@ -468,7 +493,6 @@ class expect(ExpectMetaMagic):
     
     def is_permutation_of(self, a_sequence, *additional_elements):
         def element_counts(a_sequence):
-            import collections
             counts = collections.defaultdict(int)
             for element in a_sequence:
                 counts[element] += 1
@@ -1,8 +1,42 @@
+import re
 import sys
+import string
 from contextlib import contextmanager
 
 __unittest = True # Hide from unittest.TestCase
 
+is_python2 = sys.version_info[0] < 3
+
+# Choose the python 2 or 3 version of these helpers once at import time, so calling them doesn't have to check
+
+if is_python2:
+    def detach_from_causing_exception(exception):
+        pass # python 2 doesn't chain exceptions
+    
+    exec("""def reraise(exception, traceback):
+    __tracebackhide__ = True  # Hide from py.test tracebacks
+    raise exception, None, traceback
+""")
+    
+    def force_utf8(exception):
+        try: return unicode(exception).encode('utf8')
+        except UnicodeDecodeError as ignored: pass
+        
+        return str(exception)
+else:
+    def detach_from_causing_exception(exception):
+        # Get rid of the link to the causing exception as it greatly cluttes the error message
+        exception.__cause__ = None
+        exception.with_traceback(None)
+    
+    def reraise(exception, traceback):
+        __tracebackhide__ = True  # Hide from py.test tracebacks
+        raise exception
+    
+    force_utf8 = str
+
+is_backtrace_cleaning_disabled = False
+
 def remove_internals_from_assertion_backtraces(method_to_be_wrapped):
     # Make the stacktrace easier to read by tricking python to shorten the stack trace to this method.
     # Hides the actual matcher and all the methods it calls to assert stuff.
@@ -10,17 +44,13 @@ def remove_internals_from_assertion_backtraces(method_to_be_wrapped):
     # If you have a good idea how to improve this, please tell me!
     def pyexpect_internals_hidden_in_backtraces(*args, **kwargs):
         __tracebackhide__ = True  # Hide from py.test tracebacks
-        if hasattr(remove_internals_from_assertion_backtraces, 'disabled'):
+        if is_backtrace_cleaning_disabled:
             return method_to_be_wrapped(*args, **kwargs)
         
         try:
             return method_to_be_wrapped(*args, **kwargs)
         except AssertionError as exception:
-            is_python3 = sys.version > '3'
-            if is_python3: # refact: would it be better to just check for hasattr(exception, '__cause__')?
-                # Get rid of the link to the causing exception as it greatly cluttes the error message
-                exception.__cause__ = None
-                exception.with_traceback(None)
+            detach_from_causing_exception(exception)
             raise exception # use `with expect.disabled_backtrace_cleaning():` to show full backtrace
     return pyexpect_internals_hidden_in_backtraces
 
@@ -32,16 +62,228 @@ def alias_with_hidden_backtrace(public_name):
     This method works on the class dict and is repeated after each instantiation
     to support adding or overwriting existing matchers at any time while not repeatedly doing the same.
     """
+    negating = is_negating(public_name)
+    
+    # Selects the matcher directly, there is no chain to go through for an operator
     @remove_internals_from_assertion_backtraces
     def wrapper(self, *args, **kwargs):
-        self.__getattribute__(public_name)(*args, **kwargs)
+        if negating:
+            self._expected_assertion_result = False
+        self._selected_matcher_name = public_name
+        return self._call_matcher(*args, **kwargs)
     return wrapper
 
 
+class matcher_with_class_level_alternative(object):
+    """Descriptor that behaves like the wrapped matcher when accessed on an expect instance,
+    but gives access to `class_level` (bound to the class) when accessed on the expect class itself.
+    
+    This allows a name like `raises` to work both as a matcher and as a context manager:
+    
+        expect(a_callable).raises(SomeError)
+        with expect.raises(SomeError):
+            a_callable()
+    """
+    
+    def __init__(self, matcher, class_level):
+        self.matcher = matcher
+        self.class_level = class_level
+    
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self.class_level.__get__(owner, type(owner))
+        return self.matcher.__get__(instance, owner)
+
+
+class RaisesContext(object):
+    """Context manager version of `expect().to_raise()`, see `expect.raises()`
+    
+    The caught exception is availeable as `context.exception` after the with block.
+    """
+    
+    def __init__(self, expect_class, exception_class, message_regex):
+        self.exception = None
+        self._expect_class = expect_class
+        self._exception_class = exception_class
+        self._message_regex = message_regex
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exception_class, exception, traceback):
+        __tracebackhide__ = True  # Hide from py.test tracebacks
+        if exception is None and exception_class is not None:
+            exception = exception_class()
+        
+        self.exception = self._expect_class(WithBlock(exception)) \
+            .to_raise(self._exception_class, self._message_regex)
+        return True
+
+
+class WithBlock(object):
+    "Stands in for the body of a with statement, so it can be handed to `to_raise`"
+    
+    def __init__(self, exception):
+        self._exception = exception
+    
+    def __call__(self):
+        if self._exception is not None:
+            raise self._exception
+    
+    def __repr__(self):
+        return '<with block>'
+
+
+_regex_special_characters = re.compile(r'[.^$*+?{}\[\]\\|()]')
+
+class LiteralPattern(object):
+    """Stands in for a compiled regex if the regex contains no special characters, 
+    apart from an optional leading ^ and trailing $.
+    
+    Searching is then just a substring, prefix or suffix check, which is much cheaper than running the regex engine."""
+    
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self._is_anchored_at_start = pattern.startswith('^')
+        self._is_anchored_at_end = pattern.endswith('$')
+        self._literal = pattern[int(self._is_anchored_at_start):len(pattern) - int(self._is_anchored_at_end)]
+    
+    def search(self, string):
+        if self._is_anchored_at_end and string.endswith('\n'):
+            # like re, $ also matches right before a trailing newline
+            if self._matches(string[:-1]):
+                return True
+        if self._matches(string):
+            return True
+        return None
+    
+    def _matches(self, string):
+        literal = self._literal
+        if self._is_anchored_at_start and self._is_anchored_at_end:
+            return string == literal
+        if self._is_anchored_at_start:
+            return string.startswith(literal)
+        if self._is_anchored_at_end:
+            return string.endswith(literal)
+        return literal in string
+    
+    @classmethod
+    def is_literal(cls, regex):
+        "True if the regex is a native string without special characters, apart from a leading ^ and trailing $"
+        if type(regex) is not str:
+            return False
+        if regex.startswith('^'):
+            regex = regex[1:]
+        if regex.endswith('$'):
+            regex = regex[:-1]
+        return _regex_special_characters.search(regex) is None
+
+_compiled_regexes = {}
+_MAX_COMPILED_REGEXES = 512 # like re, just start over if the cache grows too big
+
+def compile_regex(regex):
+    """Accepts a regex string or an already compiled pattern and returns the compiled pattern.
+    
+    Compiled patterns are cached so repeated expectations with the same regex don't recompile it."""
+    if hasattr(regex, 'search'):
+        return regex
+    
+    key = (type(regex), regex)
+    compiled = _compiled_regexes.get(key)
+    if compiled is None:
+        if LiteralPattern.is_literal(regex):
+            compiled = LiteralPattern(regex)
+        else:
+            compiled = re.compile(regex)
+        if len(_compiled_regexes) >= _MAX_COMPILED_REGEXES:
+            _compiled_regexes.clear()
+        _compiled_regexes[key] = compiled
+    return compiled
+
+
+_parsed_matcher_names = {}
+
+def parse_matcher_name(name):
+    """Splits a name into (matcher_name, is_negating).
+    
+    The name negates if it contains `not` as a separate snake case word, i.e. `not_to`, `is_not` or `to_not_be`.
+    The matcher name is the name without a `not_` prefix, so `not_to_be` refers to `to_be`.
+    
+    Cached per name, as the same few names are used over and over again when chaining."""
+    parsed = _parsed_matcher_names.get(name)
+    if parsed is None:
+        is_negated_matcher = name.startswith('not_')
+        negating = is_negated_matcher or '_not_' in name or name.endswith('_not')
+        matcher_name = name[4:] if is_negated_matcher else name
+        parsed = _parsed_matcher_names[name] = (matcher_name, negating)
+    return parsed
+
+def is_negating(name):
+    "True if the name contains `not` as a separate snake case word, see parse_matcher_name()"
+    return parse_matcher_name(name)[1]
+
+
+_formatter = string.Formatter()
+
+def format_custom_message(template, context):
+    "Formats a custom message with the values from the lazy MessageContext"
+    if '{' not in template and '}' not in template:
+        return template
+    
+    # str.format() copies the keywords, vformat() looks them up in the mapping, which keeps MessageContext lazy
+    return _formatter.vformat(template, (), context)
+
+
+class MessageContext(dict):
+    """The values a custom message can refer to, see ExpectMetaMagic._message()
+    
+    Values are only computed when a message actually uses them, so a custom message
+    like '{actual} is wrong' doesn't pay for formatting the original assertion message."""
+    
+    def __init__(self, expectation, message_format, message_positionals, message_keywords):
+        dict.__init__(self, self=expectation, message_format=message_format, 
+            message_positionals=message_positionals, message_keywords=message_keywords)
+    
+    def __missing__(self, key):
+        compute = self._computed_values.get(key)
+        if compute is None:
+            raise KeyError(key)
+        value = self[key] = compute(self)
+        return value
+    
+    def _message(self):
+        return force_utf8(self['message_format']).format(*self['message_positionals'], **self['message_keywords'])
+    
+    def _actual(self):
+        return repr(self['self']._actual)
+    
+    def _optional_newline(self):
+        # using two newlines to make it easier to find on a terminal
+        return '\n\n' if len(self['actual']) > 40 else ' '
+    
+    def _optional_negation(self):
+        return 'not ' if self['self']._is_negative() else ''
+    
+    def _assertion_message(self):
+        return 'Expect ' + self['actual'] + self['optional_newline'] + self['optional_negation'] + self['message']
+    
+    _computed_values = dict(
+        message=_message,
+        actual=_actual,
+        optional_newline=_optional_newline,
+        optional_negation=_optional_negation,
+        assertion_message=_assertion_message,
+    )
+
+
+# result of a successful expectation that doesn't raise
+SUCCESS = (True, "")
 
 
 class ExpectMetaMagic(object):
     
+    __slots__ = ('_expected_assertion_result', '_selected_matcher_name')
+    
     ## Internals ########################################################################################
     # REFACT: consider to find a way to separate them better from the matchers. Maybe move to a different
     # file and include as a superclass? Could even access the attributes via the class object directly to get rid of much of the __getattribute__ hack?
@@ -67,20 +309,33 @@ class ExpectMetaMagic(object):
         
         # If you include not somewhere in the called attributes name, 
         # switch the expectation to negative.
-        if name.startswith('not_') or '_not_' in name or name.endswith('_not'):
+        _, negating = parse_matcher_name(name)
+        if negating:
             self._expected_assertion_result = False
         
-        self._prepare_matcher_for_calling(name, self._matcher_with_name(name))
+        # Only remember the name, the matcher is looked up when it is actually called.
+        # That way chaining words like `to` or `is_` don't pay for a matcher lookup.
+        self._selected_matcher_name = name
         
         # Allow arbitrary chaining
         return self
     
+    def _existing_matcher_with_name(self, name):
+        __tracebackhide__ = not is_backtrace_cleaning_disabled  # Hide from py.test tracebacks
+        # TODO would be nice if this could show the availeable matchers and propose something where the spelling is close 'did you mean xxx'
+        # When listing availeable matchers, they should be groupdd by aliasses
+        matcher = None
+        if name is not None:
+            matcher = self._matcher_with_name(name)
+        if matcher is None:
+            raise NotImplementedError("Tried to call non existing matcher '{0}' (Patches welcome!)".format(name))
+        return matcher
+    
     def _matcher_with_name(self, name):
         # REFACT: consider to change matcher lookup to allow some more pre- and suffixes
         # could be be_ to_ and some more to dry up the list of alternative names that have 
         # to be written out for each matcher.
-        if name.startswith('not_'):
-            name = name[4:]
+        name, _ = parse_matcher_name(name)
         
         def _has_attr(name):
             "Need custom hasattr to prevent recursion with __getattribute__"
@@ -100,25 +355,19 @@ class ExpectMetaMagic(object):
         except AttributeError as e:
             return None
     
-    def _prepare_matcher_for_calling(self, name, matcher):
-        self._selected_matcher_name = name
-        self._selected_matcher = matcher
-    
-    @remove_internals_from_assertion_backtraces
     def __call__(self, *args, **kwargs):
         """Called whenever you actualy invoke a matcher. 
         
         Provides a good error message if you mistype the matcher name.
         
         Supports custom messages with the message keyword argument"""
+        # Exceptions other than AssertionError keep their full backtrace, so at least hide this from py.test
+        __tracebackhide__ = not is_backtrace_cleaning_disabled
         
-        # TODO would be nice if this could show the availeable matchers and propose something where the spelling is close 'did you mean xxx'
-        # When listing availeable matchers, they should be groupdd by aliasses
-        if self._selected_matcher is None:
-            raise NotImplementedError("Tried to call non existing matcher '{0}' (Patches welcome!)".format(self._selected_matcher_name))
+        matcher = self._existing_matcher_with_name(self._selected_matcher_name)
         
         try:
-            return_value = self._selected_matcher(*args, **kwargs)
+            return_value = matcher(*args, **kwargs)
             # allow an otherwise raising matcher to return something
             # usefull for matchers like expect.to_raise() to return the caught exception for further analysis
             if self._should_raise:
@@ -131,13 +380,18 @@ class ExpectMetaMagic(object):
             
             return (False, message)
         
-        return (True, "")
+        return SUCCESS
+    
+    # For the operator aliases, which are already wrapped to hide the internals from backtraces
+    _call_matcher = __call__
+    __call__ = remove_internals_from_assertion_backtraces(__call__)
     
     def _assert(self, assertion, message_format, *message_positionals, **message_keywords):
-        # FIXME assertions will be disabled in python -o 1 - so this my be no good if pyexpect is used as an expectation library in production code. See https://github.com/pyca/cryptography/commit/915e0a1194400203b0e49e05de5facbc4ac8eb66
+        # Raising explicitly instead of using the assert statement, so expectations still work with `python -O`.
+        # The message is only formatted when the expectation actually fails, as formatting (and especially repr()) can be expensive.
         # Cannot use `is` for comparison here, as some libraries like numpy will wrap comparison results in their own types which do not subclass bool on py2
-        assert assertion == self._expected_assertion_result, \
-            self._message(message_format, message_positionals, message_keywords)
+        if not assertion == self._expected_assertion_result:
+            raise AssertionError(self._message(message_format, message_positionals, message_keywords))
     
     def _assert_if_positive(self, assertion, message_format, *message_positionals, **message_keywords):
         if self._is_negative():
@@ -152,24 +406,20 @@ class ExpectMetaMagic(object):
         self._assert(assertion, message_format, *message_positionals, **message_keywords)
     
     def _message(self, message_format, message_positionals, message_keywords):
+        if self._custom_message is not None:
+            # Custom messages can refer to self, message_format, message_positionals, message_keywords,
+            # message, actual, optional_newline, optional_negation and assertion_message, see MessageContext
+            context = MessageContext(self, message_format, message_positionals, message_keywords)
+            return format_custom_message(self._custom_message, context)
+        
         message = self._force_utf8(message_format).format(*message_positionals, **message_keywords)
         actual = repr(self._actual)
         # using two newlines to make it easier to find on a terminal
         optional_newline = '\n\n' if len(actual) > 40 else ' '
         optional_negation = 'not ' if self._is_negative() else ''
-        assertion_message = "Expect {actual}{optional_newline}{optional_negation}{message}".format(**locals())
-        
-        if self._custom_message is not None:
-            return self._custom_message.format(**locals())
-        
-        return assertion_message
+        return 'Expect ' + actual + optional_newline + optional_negation + message
     
-    def _force_utf8(self, exception):
-        if sys.version < '3':
-            try: return unicode(exception).encode('utf8')
-            except UnicodeDecodeError as ignored: pass
-        
-        return str(exception)
+    _force_utf8 = staticmethod(force_utf8)
     
     def _is_negative(self):
         return self._expected_assertion_result is False
@@ -180,9 +430,11 @@ class ExpectMetaMagic(object):
     @staticmethod
     @contextmanager
     def disabled_backtrace_cleaning():
-        remove_internals_from_assertion_backtraces.disabled = True
+        global is_backtrace_cleaning_disabled
+        was_disabled = is_backtrace_cleaning_disabled
+        is_backtrace_cleaning_disabled = True
         try:
             yield
         finally:
-            del remove_internals_from_assertion_backtraces.disabled
+            is_backtrace_cleaning_disabled = was_disabled
     
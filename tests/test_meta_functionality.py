@@ -3,9 +3,33 @@
 from pyexpect import expect
 from unittest import TestCase
 import sys
+import traceback
+import re
+import weakref
+import abc
+
+_PY2 = sys.version_info[0] < 3
+_UNICODE_FNORD = re.compile(r"^Expect 1 Fnörd$")
 
 class MetaFunctionalityTest(TestCase):
     
+    @classmethod
+    def setUpClass(cls):
+        # shared subclass to add matchers to, so tests don't pollute the original expect()
+        cls.local_expect = type('local_expect', (expect,), {})
+    
+    def setUp(self):
+        self._local_expect_attributes = dict(vars(self.local_expect))
+    
+    def tearDown(self):
+        # restore whatever a test added or overwrote, so tests stay independent of each other and their order
+        attributes = vars(self.local_expect)
+        for name in set(attributes) - set(self._local_expect_attributes):
+            delattr(self.local_expect, name)
+        for name, value in self._local_expect_attributes.items():
+            if attributes.get(name) is not value:
+                setattr(self.local_expect, name, value)
+    
     def test_can_subclass_expect(self):
         """Usefull if you want to extend expect with custom matchers without polluting the original expect()
         Used in the test suite to keep test isolation high."""
@@ -13,11 +37,12 @@ class MetaFunctionalityTest(TestCase):
             def local_matcher(self, arg):
                 self._assert(self._actual == 1, "got " + arg)
         local_expect(1).local_matcher('one')
-        expect(lambda: local_expect(2).local_matcher('two')).to_raise(AssertionError, r"^Expect 2 got two$")
+        with expect.raises(AssertionError, r"^Expect 2 got two$"):
+            local_expect(2).local_matcher('two')
     
     def test_can_add_custom_matchers_via_simple_assignment(self):
         calls = []
-        class local_expect(expect): pass
+        local_expect = self.local_expect
         local_expect.custom_matcher = lambda *arguments: calls.append(arguments)
         
         instance = local_expect('foo')
@@ -27,44 +52,131 @@ class MetaFunctionalityTest(TestCase):
         expect(calls).to.contain((instance,))
         expect(calls).to.contain((instance, 'bar', 'baz'))
     
+    def test_custom_matchers_can_store_state_on_the_expectation(self):
+        def remembering_matcher(self, value):
+            self._remembered = value
+            self._assert(self._actual == self._remembered, "to equal remembered {0!r}", value)
+        local_expect = self.local_expect
+        local_expect.remembering_matcher = remembering_matcher
+        expect.remembering_matcher = remembering_matcher
+        try:
+            local_expect(1).remembering_matcher(1)
+            expect(1).remembering_matcher(1)
+        finally:
+            del expect.remembering_matcher
+    
+    def test_expectations_can_be_weakly_referenced(self):
+        expectation = expect(1)
+        expect(weakref.ref(expectation)()).is_(expectation)
+    
     def test_error_message_is_sane(self):
         "Different ways to trigger the matchers should not generate the error message different"
-        expect(lambda: expect(0) != 0).to_raise(AssertionError, "^Expect 0 not to equal 0$")
-        expect(lambda: expect(0) == 1).to_raise(AssertionError, "^Expect 0 to equal 1$")
+        with expect.raises(AssertionError, "^Expect 0 not to equal 0$"):
+            expect(0) != 0
+        with expect.raises(AssertionError, "^Expect 0 to equal 1$"):
+            expect(0) == 1
         
-        expect(lambda: expect(0).is_.different(0)).to_raise(AssertionError, "^Expect 0 not to equal 0$")
-        expect(lambda: expect(0).not_.equals(0)).to_raise(AssertionError, "^Expect 0 not to equal 0$")
-        expect(lambda: expect(0).not_equals(0)).to_raise(AssertionError, "^Expect 0 not to equal 0$")
-        expect(lambda: expect(0).equals(1)).to_raise(AssertionError, "^Expect 0 to equal 1$")
+        with expect.raises(AssertionError, "^Expect 0 not to equal 0$"):
+            expect(0).is_.different(0)
+        with expect.raises(AssertionError, "^Expect 0 not to equal 0$"):
+            expect(0).not_.equals(0)
+        with expect.raises(AssertionError, "^Expect 0 not to equal 0$"):
+            expect(0).not_equals(0)
+        with expect.raises(AssertionError, "^Expect 0 to equal 1$"):
+            expect(0).equals(1)
         
         # nested matcher
-        expect(lambda: expect(0).to_raise()).to_raise(AssertionError, "^Expect 0 to be callable$")
+        with expect.raises(AssertionError, "^Expect 0 to be callable$"):
+            expect(0).to_raise()
     
     def test_wraps_really_long_error_messages_to_make_them_easier_to_read(self):
         error = expect(lambda: expect("really_long " * 50).to_equal('something shorter')).to_raise()
         expect(str(error)).to_match(r'\n\nto equal ')
     
+    def test_matchers_can_be_added_replaced_and_removed_after_first_use(self):
+        local_expect = self.local_expect
+        local_subclass_expect = type('local_subclass_expect', (local_expect,), {})
+        local_subclass_expect(1).equals(1)
+        
+        local_expect.fnord = lambda self: self._assert(False, "first")
+        with expect.raises(AssertionError, r"^Expect 1 first$"):
+            local_subclass_expect(1).fnord()
+        
+        local_expect.fnord = lambda self: self._assert(False, "second")
+        with expect.raises(AssertionError, r"^Expect 1 second$"):
+            local_subclass_expect(1).fnord()
+        
+        del local_expect.fnord
+        with expect.raises(NotImplementedError, r"Tried to call non existing matcher 'fnord'"):
+            local_subclass_expect(1).fnord()
+    
+    def test_matchers_can_come_from_mixins_abcs_and_instances(self):
+        class Mixin(object):
+            pass
+        class mixin_expect(Mixin, expect):
+            pass
+        mixin_expect(1).equals(1)
+        Mixin.fnord = lambda self: self._assert(False, "from mixin")
+        with expect.raises(AssertionError, r"^Expect 1 from mixin$"):
+            mixin_expect(1).fnord()
+        
+        abc_expect = type('abc_expect', (expect, abc.ABC if not _PY2 else object), {})
+        abc_expect(1).equals(1)
+        
+        expectation = expect(1)
+        expectation.fnord = lambda: expectation._assert(False, "from instance")
+        with expect.raises(AssertionError, r"^Expect 1 from instance$"):
+            expectation.fnord()
+    
     def test_assertion_can_contain_unicode_message(self):
-        class local_expect(expect): pass
+        local_expect = self.local_expect
         local_expect.fnord = lambda self: self._assert(False, "Fnörd")
-        expect(lambda: local_expect(1).fnord()).to_raise(AssertionError, r"^Expect 1 Fnörd$")
+        with expect.raises(AssertionError, _UNICODE_FNORD):
+            local_expect(1).fnord()
         
         local_expect.fnord = lambda self: self._assert(False, u"Fnörd")
-        expect(lambda: local_expect(1).fnord()).to_raise(AssertionError, r"^Expect 1 Fnörd$")
+        with expect.raises(AssertionError, _UNICODE_FNORD):
+            local_expect(1).fnord()
+    
+    def test_only_formats_error_message_if_expectation_fails(self):
+        reprs = []
+        class Reprable(object):
+            def __repr__(self):
+                reprs.append(self)
+                return '<Reprable>'
+        
+        expect(Reprable()).exists()
+        expect(Reprable()).not_.to_be(None)
+        expect(reprs).is_empty()
+        
+        with expect.raises(AssertionError, r"^Expect <Reprable> to be None$"):
+            expect(Reprable()).to_be(None)
+        expect(reprs).has_length(1)
+        
+        with expect.raises(AssertionError, r"^fnord$"):
+            expect(Reprable(), message='fnord').to_be(None)
+        reprable = Reprable()
+        with expect.raises(AssertionError, r"^fnord not $"):
+            expect(reprable, message='fnord {optional_negation}').not_.to_be(reprable)
+        expect(reprs).has_length(1)
     
     def test_error_message_when_calling_non_existing_matcher_is_good(self):
-        expect(lambda: expect('fnord').nonexisting_matcher()) \
-            .to_raise(NotImplementedError, r"Tried to call non existing matcher 'nonexisting_matcher'")
+        with expect.raises(NotImplementedError, r"Tried to call non existing matcher 'nonexisting_matcher'"):
+            expect('fnord').nonexisting_matcher()
     
     def test_dont_double_enhance_exceptions_from_internally_used_expect_calls(self):
-        class local_expect(expect):
-            def nested_expect(self):
-                expect(True, message='Fnord') == False
-            def nested_assert(self):
-                assert False, "Fnord"
+        def nested_expect(self):
+            expect(True, message='Fnord') == False
+        def nested_assert(self):
+            assert False, "Fnord"
+        local_expect = self.local_expect
+        local_expect.nested_expect = nested_expect
+        local_expect.nested_assert = nested_assert
         
-        expect(lambda: local_expect(None).nested_expect()).to_raise(AssertionError, "^Fnord$")
-        expect(lambda: local_expect(None).nested_assert()).to_raise(AssertionError, "^Fnord$")
+        with expect.raises(AssertionError, "^Fnord$"):
+            local_expect(None).nested_expect()
+        with expect.raises(AssertionError, "^Fnord$"):
+            local_expect(None).nested_assert()
     
     def test_can_specify_custom_message(self):
         def messaging(message):
@@ -74,9 +186,10 @@ class MetaFunctionalityTest(TestCase):
             .to_raise(AssertionError, r"^fnord <Expect True not to be True> fnord$")
         expect(messaging('{actual}-{optional_negation}')).to_raise(AssertionError, r"^True-not $")
         expect(messaging('{actual}')).to_raise(AssertionError, r"^True$")
+        expect(messaging('{optional_negation!r:>8}|{{actual}}')).to_raise(AssertionError, r"^  'not '\|\{actual\}$")
         
-        expect(lambda: expect.with_message('fnord', True).to.be(False)) \
-            .to_raise(AssertionError, r"^fnord$")
+        with expect.raises(AssertionError, r"^fnord$"):
+            expect.with_message('fnord', True).to.be(False)
         
         # TODO: allow partially formatted messages from expect.with_message
         # Problem: the custom message is again piped through format, which breaks if 
@@ -101,8 +214,16 @@ class MetaFunctionalityTest(TestCase):
     def test_not_negates_only_if_on_word_boundaries(self):
         expect(lambda: expect(True).nothing_that_negates.is_(True)).not_.to_raise()
         expect(lambda: expect(True).annotation.to.be(True)).not_.to_raise()
-        expect(lambda: expect(True).an_not_ation.to.be(True)).to_raise()
-        expect(lambda: expect(True).an_not.to.be(True)).to_raise()
+        with expect.raises():
+            expect(True).an_not_ation.to.be(True)
+        with expect.raises():
+            expect(True).an_not.to.be(True)
+        
+        expect(True).notable.knot_to.cannot_be.to.be(True)
+        with expect.raises(AssertionError, r"^Expect True not to be True$"):
+            expect(True).is_not_quite.to.be(True)
+        with expect.raises(AssertionError, r"^Expect True not to be True$"):
+            expect(True).not_.to.be(True)
     
     def test_not_in_path_inverts_every_matcher(self):
         expect(3).to_be(3)
@@ -123,25 +244,27 @@ class MetaFunctionalityTest(TestCase):
         expect(expect(False, should_raise=False).not_to.be(True)).equals((True, ""))
         expect(expect.returning(False).to_be(False)).equals((True, ""))
         expect(expect.returning(False).to_be(True)).to_equal((False, "Expect False to be True"))
+        expect(expect.returning(False) == False).equals((True, ""))
+        expect(expect.returning(False) == True).to_equal((False, "Expect False to equal True"))
+        expect(expect.returning(3) > 4).to_equal((False, "Expect 3 to be greater than 4"))
     
     def test_missing_argument_to_expect_raises_with_good_error_message(self):
-        expect(lambda: expect()).to_raise(TypeError)
+        with expect.raises(TypeError):
+            expect()
     
     def test_should_not_add_extra_backtrace_if_causing_exception_in_python_3(self):
-        if sys.version < '3':
+        if _PY2:
             return # only a problem in python 3
         
         formatted = None
         try:
             expect(1).equals(2)
         except AssertionError as error:
-            import traceback
             formatted = traceback.format_exc()
         
         expect(formatted).not_to_contain("During handling of the above exception, another exception occurred")
     
     def test_stacktrace_hides_most_of_the_internals_of_pyexpects_machinery(self):
-        import traceback
         exception_traceback = None
         try:
             # Standard, should only contain __call__ as top level entry
@@ -158,7 +281,6 @@ class MetaFunctionalityTest(TestCase):
         expect(processed_traceback[1]).to_contain('raise exception # use `with expect.disabled_backtrace_cleaning():` to show full backtrace')
     
     def test_stacktrace_does_not_contain_an_extra_method_when_wrapping_operator_matchers(self):
-        import traceback
         exception_traceback = None
         try:
             # Not the standard as it has more wrappers
@@ -175,21 +297,20 @@ class MetaFunctionalityTest(TestCase):
         expect(processed_traceback[1]).to_contain('raise exception # use `with expect.disabled_backtrace_cleaning():` to show full backtrace')
     
     def test_hides_double_underscore_alternative_names_from_tracebacks(self):
-        import sys
-        assertion = None
+        assertion = exception_traceback = None
         try:
             expect(3) != 3
         except AssertionError as a:
             assertion = a
+            _, _, exception_traceback = sys.exc_info()
         
         expect(assertion) != None
-        import traceback
-        traceback = '\n'.join(traceback.format_tb(sys.exc_info()[2]))
-        expect(traceback).not_to.contain('__ne__')
+        formatted = '\n'.join(traceback.format_tb(exception_traceback))
+        expect(formatted).to.contain('pyexpect_internals_hidden_in_backtraces')
+        expect(formatted).not_to.contain('__ne__')
     
     def test_can_disable_backtrace_hiding(self):
         # To ease debugging matchers
-        import traceback
         exception_traceback = None
         with expect.disabled_backtrace_cleaning():
             try:
@@ -204,6 +325,24 @@ class MetaFunctionalityTest(TestCase):
         expect(function_names).contains('equal')
         expect(function_names).contains('_assert')
     
+    def test_marks_internals_as_hidden_for_py_test_in_backtraces_that_are_not_cleaned(self):
+        def hidden_function_names():
+            exception_traceback = None
+            try:
+                expect(1).nonexisting_matcher()
+            except NotImplementedError as error:
+                _, _, exception_traceback = sys.exc_info()
+            function_names = []
+            while exception_traceback is not None:
+                if exception_traceback.tb_frame.f_locals.get('__tracebackhide__'):
+                    function_names.append(exception_traceback.tb_frame.f_code.co_name)
+                exception_traceback = exception_traceback.tb_next
+            return function_names
+        
+        expect(hidden_function_names()).to_contain('__call__', '_existing_matcher_with_name')
+        with expect.disabled_backtrace_cleaning():
+            expect(hidden_function_names()).not_to_contain('__call__', '_existing_matcher_with_name')
+    
     def test_comparing_types_which_return_trueish_works(self):
         # numpy does this. If you compary numpy.float64 to int, you get a numpy.bool as a result
         class MyBool(object):
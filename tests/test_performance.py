@@ -2,26 +2,34 @@
 
 from unittest import TestCase
 import sys
+import timeit
+import cProfile
 
+import pyexpect
 from pyexpect import expect
 
 class PerformanceTest(TestCase):
     
     def _test_raw_timeing(self):
-        import timeit
-        time = timeit.timeit("expect('foo') == 'foo'", "from pyexpect import expect", number=100000)
-        self.fail(time)
+        # Separate cases to see whether operators, chaining or exception handling dominate.
+        # Callables instead of statement strings, as timeit has no globals= on python 2
+        cases = [
+            ("expect('foo') == 'foo'", lambda: expect('foo') == 'foo'),
+            ("expect(3).to_be(3)", lambda: expect(3).to_be(3)),
+            ("expect(3).equals(3)", lambda: expect(3).equals(3)),
+            ("expect(lambda: None).not_to_raise(ValueError)", lambda: expect(lambda: None).not_to_raise(ValueError)),
+        ]
+        timings = ['{0}: {1:.3f}s'.format(name, timeit.timeit(statement, number=100000)) for name, statement in cases]
+        self.fail('\n'.join(timings))
     
     def _test_cprofile(self):
-        import cProfile
         cProfile.run("from pyexpect import expect; expect('foo') == 'foo'")
         self.fail()
     
     def _test_line_profiler(self):
-        import line_profiler
+        import line_profiler # optional, only needed for this test
         profiler = line_profiler.LineProfiler()
-        import pyexpect
         profiler.add_module(pyexpect)
         profiler.run("from pyexpect import expect; expect('foo') == 'foo'")
         profiler.print_stats(stripzeros=True)
-        self.fail()
\ No newline at end of file
+        self.fail()